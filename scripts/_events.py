@@ -0,0 +1,37 @@
+"""
+Load events.json once and look up test events by name.
+
+The parse is cached per file modification time, so repeated lookups in one
+process skip the disk read and parse until events.json changes.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import orjson  # Optional: faster JSON parsing
+except ImportError:
+    orjson = None
+
+EVENTS_FILE = Path(__file__).parent.parent / "events.json"
+
+
+@lru_cache(maxsize=4)
+def _load(path: str, mtime_ns: int) -> list:
+    """Parse the events file; mtime_ns is only part of the cache key."""
+    data = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_events(path: Path = EVENTS_FILE) -> list:
+    """Return the parsed events, re-reading only when the file has changed."""
+    return _load(str(path), path.stat().st_mtime_ns)
+
+
+def find_event(name_substr: str, path: Path = EVENTS_FILE) -> dict:
+    """Return the first event whose name contains name_substr, else the first event."""
+    events = load_events(path)
+    return next((e for e in events if name_substr in e.get('event_name', '')), events[0])
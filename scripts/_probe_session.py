@@ -0,0 +1,78 @@
+"""
+Session and page helpers shared by the test_single*.py / test_all.py probes.
+
+The probes resume the Zoom session saved by the previous run (so an accepted
+passcode is not re-entered) and inspect pages through _transcript_probe.js.
+"""
+
+import asyncio
+from pathlib import Path
+
+from _transcript_core import block_unneeded_resources
+
+# Cookies and local storage saved by the test scripts, so a passcode accepted
+# once is not re-entered on the next run
+STATE_FILE = Path(__file__).parent / ".zoom_state.json"
+# Page-side helpers (window.__probe*) used by the test scripts' inspection steps
+PROBE_JS = Path(__file__).parent / "_transcript_probe.js"
+
+
+def saved_state():
+    """storage_state for browser.new_context(): the last saved session, if any."""
+    return str(STATE_FILE) if STATE_FILE.exists() else None
+
+
+async def submit_passcode_if_prompted(page, passcode: str, log_prefix: str = '') -> None:
+    """Submit passcode if Zoom prompts for it; a resumed session usually skips the prompt."""
+    try:
+        # A saved session skips the prompt, so wait for the prompt or the player
+        await page.locator(
+            'input[type="password"], button:has-text("Audio Transcript"), video'
+        ).first.wait_for(timeout=15000)
+        pwd_input = page.locator('input[type="password"]')
+        if not await pwd_input.count():
+            print(f"{log_prefix}No passcode prompt (saved session)")
+            return
+        print(f"{log_prefix}Entering passcode: {passcode}")
+        await pwd_input.first.fill(passcode)
+        # Start waiting for the player before the click so nothing is missed
+        await asyncio.gather(
+            page.locator('button[type="submit"], #passcode_btn').first.click(timeout=10000),
+            page.locator('button:has-text("Audio Transcript"), video').first.wait_for(timeout=15000),
+        )
+        print(f"{log_prefix}Passcode submitted")
+    except Exception as e:
+        print(f"{log_prefix}Passcode handling: {e}")
+
+
+async def new_probe_context(browser, **context_options):
+    """New context for the test scripts, resuming the saved session.
+
+    context_options are passed to browser.new_context().
+    """
+    context = await browser.new_context(storage_state=saved_state(), **context_options)
+    # Define window.__probe* once per context instead of sending the source per call
+    await context.add_init_script(path=PROBE_JS)
+    # Images and fonts aren't needed to inspect the transcript; media stays on
+    # because the player shows "The media could not be loaded" without it
+    await context.route("**/*", block_unneeded_resources)
+    return context
+
+
+async def close_probe_context(context):
+    """Save the session (passcode cookie) for the next run, then close the context.
+
+    Only the context is closed, so a browser shared over CDP stays up.
+    """
+    await context.storage_state(path=STATE_FILE)
+    await context.close()
+
+
+async def capture_mhtml(page) -> str:
+    """Snapshot the page as MHTML over CDP, serialized by the browser rather than Python."""
+    cdp = await page.context.new_cdp_session(page)
+    try:
+        snapshot = await cdp.send('Page.captureSnapshot', {'format': 'mhtml'})
+    finally:
+        await cdp.detach()
+    return snapshot['data']
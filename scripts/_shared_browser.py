@@ -0,0 +1,29 @@
+"""
+Reuse one long-running Chrome across scripts instead of cold-starting a browser per run.
+
+Start Chrome once with remote debugging and point the scripts at it:
+
+    google-chrome --remote-debugging-port=9222 &
+    export ZOOM_CDP=http://localhost:9222
+"""
+
+import os
+
+
+async def get_browser(p, cdp_url: str = '', **launch_options):
+    """Connect to the Chrome at cdp_url (or $ZOOM_CDP) if reachable, else launch one.
+
+    launch_options are passed to p.chromium.launch() for the fallback. Closing a
+    browser obtained over CDP only disconnects; the shared Chrome keeps running.
+    """
+    cdp_url = cdp_url or os.environ.get('ZOOM_CDP', '')
+    if cdp_url:
+        try:
+            browser = await p.chromium.connect_over_cdp(cdp_url)
+            print(f"Connected to running browser: {cdp_url}")
+            return browser
+        except Exception as e:
+            print(f"Could not connect to {cdp_url} ({e}), launching a new browser")
+
+    return await p.chromium.launch(**launch_options)
+
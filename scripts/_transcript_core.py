@@ -0,0 +1,600 @@
+"""
+Shared Zoom transcript scraping used by download_transcripts.py and retry_failed.py.
+"""
+
+import asyncio
+import io
+import json
+import os
+import re
+import time
+from pathlib import Path
+from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+SCROLL_PAUSE = 0.5  # Max seconds to wait for the transcript list to react to a scroll
+SCROLL_END_QUIET = 1.0  # Seconds with no scrolling, mutations or new rows before stopping early
+MAX_SCROLL_ATTEMPTS = 300  # Maximum scroll iterations for long transcripts
+PAGE_TIMEOUT = 30000  # Default navigation timeout (ms)
+CONTENT_TIMEOUT = 30000  # Default max wait for the player/transcript UI to render (ms)
+MAX_RETRIES = 2  # Extra attempts after a timeout, doubling both timeouts each time
+CONTEXT_MAX_USES = 50  # Recycle a pooled context after this many events
+MAX_PAGES_PER_EVENT = 2  # Zoom links of one event downloaded at once (pages per context)
+# Keep N concurrent pages within bounded memory and stop Chrome's own background
+# traffic from delaying page loads
+BROWSER_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--js-flags=--max-old-space-size=512',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-background-networking',
+    '--disable-renderer-backgrounding',
+]
+# Use Chrome for proper video codec support. Its headless mode is the full
+# ("new") headless Chrome, codecs included; set ZOOM_HEADLESS=0 to watch it.
+LAUNCH_OPTIONS = {
+    'headless': os.environ.get('ZOOM_HEADLESS', '1') == '1',
+    'channel': 'chrome',
+    'args': BROWSER_ARGS,
+}
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+# Hide automation
+HIDE_WEBDRIVER_JS = "Object.defineProperty(navigator, 'webdriver', { get: () => undefined });"
+# Resource types never needed to scrape transcript text. Media and stylesheets stay
+# enabled: the player reports a blocked video as "The media could not be loaded",
+# and the transcript panel only scrolls (and virtualizes) with its CSS applied.
+BLOCKED_RESOURCE_TYPES = {'image', 'font'}
+# Present once the recording page has rendered: the transcript panel itself, or
+# the tab that opens it
+CONTENT_READY_SELECTOR = (
+    '.transcript-wrapper, [class*="transcript-list"], [class*="TranscriptList"], '
+    'button:has-text("Audio Transcript")'
+)
+
+
+_TITLE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+_UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*]')
+_WHITESPACE = re.compile(r'\s+')
+_DASHES = re.compile(r'-+')
+
+
+def sanitize_filename(name: str) -> str:
+    """Convert event name to safe filename."""
+    safe = _UNSAFE_CHARS.sub('', name)
+    safe = _WHITESPACE.sub('-', safe)
+    safe = _DASHES.sub('-', safe)
+    safe = safe.strip('-')
+    return safe[:80]
+
+
+def format_transcript_as_markdown(event_name: str, date: str, transcript_entries: list) -> str:
+    """Format transcript entries into Markdown."""
+    buf = io.StringIO()
+    write = buf.write
+    write(f"# {event_name}\n**Date:** {date}\n\n---\n")
+
+    current_speaker = None
+    for entry in transcript_entries:
+        text = entry['text'].strip()
+
+        # Skip entries without text
+        if not text:
+            continue
+
+        speaker = entry['speaker'].strip()
+        timestamp = entry['timestamp'].strip()
+
+        # Add speaker/timestamp header when speaker changes or first entry
+        if speaker and speaker != current_speaker:
+            current_speaker = speaker
+            write(f"\n### {speaker}\n")
+
+        # Add timestamp and text
+        if timestamp:
+            write(f"\n**[{timestamp}]** {text}\n")
+        else:
+            write(f"\n{text}\n")
+
+    return buf.getvalue()
+
+
+async def is_live(url: str, request) -> bool:
+    """Check over plain HTTP whether a recording still exists, without opening a page."""
+    try:
+        response = await request.get(url, timeout=10000)
+        html = await response.text()
+    except Exception:
+        # Inconclusive; let the browser find out
+        return True
+
+    title = _TITLE.search(html)
+    return not (title and 'Error' in title.group(1) and 'does not exist' in html)
+
+
+async def enter_passcode(page, passcode: str, timeout: int = 15000, tag: str = '') -> bool:
+    """Enter passcode on Zoom recording page if required."""
+    try:
+        pwd_input = await page.wait_for_selector('input[type="password"]', timeout=5000)
+    except PlaywrightTimeout:
+        print(f"    {tag}No passcode required")
+        return True
+    except Exception as e:
+        print(f"    {tag}Passcode error: {e}")
+        return False
+
+    try:
+        print(f"    {tag}Entering passcode...")
+        await pwd_input.fill(passcode)
+
+        submit = await page.query_selector('button[type="submit"], #passcode_btn')
+        if submit:
+            await submit.click()
+            # Zoom's player rarely goes network-idle; wait for its UI instead
+            await page.wait_for_selector(CONTENT_READY_SELECTOR, state='attached', timeout=timeout)
+    except PlaywrightTimeout:
+        print(f"    {tag}Player UI not detected after passcode")
+    except Exception as e:
+        print(f"    {tag}Passcode error: {e}")
+        return False
+    return True
+
+
+async def click_transcript_tab(page, tag: str = '') -> bool:
+    """Click the Audio Transcript tab if not already active."""
+    try:
+        # Look for Audio Transcript button/tab
+        tab = await page.query_selector('button:has-text("Audio Transcript")')
+        if tab:
+            await tab.click()
+            await page.wait_for_timeout(2000)
+            return True
+    except Exception as e:
+        print(f"    {tag}Note: Could not click transcript tab: {e}")
+    return False
+
+
+async def cdp_evaluate(cdp, function: str, arg=None):
+    """Call a JS function in the page over a raw CDP session and return its value.
+
+    Like page.evaluate, a returned promise is awaited and arg is passed as the
+    function's only (JSON-serializable) argument.
+    """
+    result = await cdp.send('Runtime.evaluate', {
+        'expression': f'({function})({json.dumps(arg)})',
+        'returnByValue': True,
+        'awaitPromise': True,
+    })
+    if 'exceptionDetails' in result:
+        # 'text' is usually just "Uncaught"; the thrown error's description has the message
+        details = result['exceptionDetails']
+        raise RuntimeError(details.get('exception', {}).get('description')
+                           or details.get('text', 'Runtime.evaluate failed'))
+    return result['result'].get('value')
+
+
+async def scrape_transcript(page, tag: str = '') -> list:
+    """Scrape the full transcript by scrolling through the transcript panel."""
+    transcript_entries = []
+
+    # Wait for transcript to be visible
+    await page.wait_for_timeout(2000)
+
+    # Click Audio Transcript tab
+    await click_transcript_tab(page, tag)
+
+    # The scroll loop evaluates JS hundreds of times; send those straight over CDP
+    cdp = await page.context.new_cdp_session(page)
+
+    # Timestamp DOM changes in the transcript so each scroll can wait for the list to
+    # re-render instead of sleeping a fixed SCROLL_PAUSE
+    await cdp_evaluate(cdp, '''() => {
+        const target = document.querySelector('.transcript-wrapper, [class*="transcript-list"], [class*="TranscriptList"]');
+        window.__transcriptMutatedAt = 0;
+        new MutationObserver(() => { window.__transcriptMutatedAt = performance.now(); })
+            .observe(target || document.body, { childList: true, subtree: true, characterData: true });
+    }''')
+
+    seen_texts = set()
+    scroll_count = 0
+    no_new_count = 0
+    last_count = 0
+    last_activity = time.monotonic()
+
+    try:
+        while scroll_count < MAX_SCROLL_ATTEMPTS:
+            # Extract visible transcript entries, then scroll the panel, in one round-trip
+            step = await cdp_evaluate(cdp, '''async (settleMs) => {
+                // First HH:MM:SS in the text, scanned by char code (runs for every row)
+                const isDigit = c => c >= 48 && c <= 57;
+                const findTimestamp = s => {
+                    for (let i = 0; i <= s.length - 8; i++) {
+                        if (isDigit(s.charCodeAt(i)) && isDigit(s.charCodeAt(i + 1)) && s.charCodeAt(i + 2) === 58 &&
+                            isDigit(s.charCodeAt(i + 3)) && isDigit(s.charCodeAt(i + 4)) && s.charCodeAt(i + 5) === 58 &&
+                            isDigit(s.charCodeAt(i + 6)) && isDigit(s.charCodeAt(i + 7))) {
+                            return s.substring(i, i + 8);
+                        }
+                    }
+                    return null;
+                };
+
+                const extract = () => {
+                    const results = [];
+                    // Remember each node's last text so only new or changed rows are
+                    // parsed and sent back; the list is virtualized, so nodes come and go
+                    const seen = window.__transcriptSeen || (window.__transcriptSeen = new WeakMap());
+
+                    // Look specifically for transcript list items within the transcript panel
+                    // The transcript wrapper contains the actual transcript entries
+                    const transcriptPanel = document.querySelector('.transcript-wrapper, [class*="transcript-list"], [class*="TranscriptList"]');
+
+                    if (!transcriptPanel) {
+                        // Fallback: look for li elements with timestamp pattern
+                        const allLis = document.querySelectorAll('li');
+                        allLis.forEach(item => {
+                            const text = item.textContent?.trim() || '';
+                            if (seen.get(item) === text) return;
+                            seen.set(item, text);
+                            // Only include items that have a timestamp pattern (HH:MM:SS)
+                            const timestamp = findTimestamp(text);
+                            if (timestamp && text.length > 30) {
+                                // Extract speaker: text before timestamp
+                                const beforeTimestamp = text.split(timestamp)[0].trim();
+                                // Extract transcript text: after second occurrence of timestamp
+                                const parts = text.split(timestamp);
+                                let transcriptText = parts.length > 2 ? parts[2].trim() : (parts[1] ? parts[1].trim() : '');
+
+                                if (transcriptText.length > 5) {
+                                    results.push({
+                                        speaker: beforeTimestamp,
+                                        timestamp: timestamp,
+                                        text: transcriptText
+                                    });
+                                }
+                            }
+                        });
+                        return results;
+                    }
+
+                    // If we found the transcript panel, look for entries within it
+                    const items = transcriptPanel.querySelectorAll('li, [class*="item"], [class*="entry"]');
+
+                    items.forEach(item => {
+                        const text = item.textContent?.trim() || '';
+                        if (seen.get(item) === text) return;
+                        seen.set(item, text);
+
+                        // Must have timestamp to be a transcript entry
+                        const timestamp = findTimestamp(text);
+                        if (!timestamp) return;
+
+                        // Split by timestamp to get speaker and text
+                        const parts = text.split(timestamp);
+                        const speaker = parts[0] ? parts[0].trim() : '';
+                        // The text appears after the timestamp (which may appear twice)
+                        let transcriptText = parts.length > 2 ? parts[2].trim() : (parts[1] ? parts[1].trim() : '');
+
+                        if (transcriptText.length > 5) {
+                            results.push({
+                                speaker: speaker,
+                                timestamp: timestamp,
+                                text: transcriptText
+                            });
+                        }
+                    });
+
+                    return results;
+                };
+
+                const scroll = () => {
+                    // Page down by (almost) a full viewport: every row still gets rendered
+                    // once, unlike End which lets the virtualized list skip the middle
+                    const pageDown = el => {
+                        const before = el.scrollTop;
+                        el.scrollTop += Math.max(500, el.clientHeight * 0.9);
+                        return el.scrollTop > before;
+                    };
+
+                    // Find scrollable transcript container
+                    const containers = document.querySelectorAll('[class*="transcript"], [class*="Transcript"]');
+                    for (const container of containers) {
+                        if (container.scrollHeight > container.clientHeight) {
+                            return pageDown(container);
+                        }
+                    }
+
+                    // Fallback: try scrolling any ul element
+                    const ul = document.querySelector('ul');
+                    if (ul && ul.scrollHeight > ul.clientHeight) {
+                        return pageDown(ul);
+                    }
+
+                    return false;
+                };
+
+                // Wait until the list mutates after the scroll, or settleMs passes
+                const waitForMutation = since => new Promise(resolve => {
+                    const check = () => {
+                        if (window.__transcriptMutatedAt > since) return resolve(true);
+                        if (performance.now() - since > settleMs) return resolve(false);
+                        setTimeout(check, 25);
+                    };
+                    check();
+                });
+
+                const results = extract();
+                const scrolledAt = performance.now();
+                const scrolled = scroll();
+                return { results: results, scrolled: scrolled, mutated: await waitForMutation(scrolledAt) };
+            }''', int(SCROLL_PAUSE * 1000))
+            entries = step['results']
+            scrolled = step['scrolled']
+            mutated = step['mutated']
+
+            # Add new entries (dedupe by text in case a row is re-rendered as a new node)
+            for entry in entries:
+                text_key = entry.get('text', '')[:100]
+                if text_key and text_key not in seen_texts:
+                    seen_texts.add(text_key)
+                    transcript_entries.append(entry)
+
+            # Check progress
+            if scrolled or mutated:
+                last_activity = time.monotonic()
+            if len(transcript_entries) == last_count:
+                no_new_count += 1
+                # Nothing left to scroll and the list stopped changing for a while; a
+                # single quiet step isn't enough, since the panel isn't scrollable yet
+                # while rows are still streaming in
+                at_end = (transcript_entries and not scrolled and not mutated
+                          and time.monotonic() - last_activity >= SCROLL_END_QUIET)
+                if no_new_count >= 15 or at_end:
+                    print(f"    {tag}Finished scrolling (no new content)")
+                    break
+            else:
+                no_new_count = 0
+                last_count = len(transcript_entries)
+                last_activity = time.monotonic()
+
+            scroll_count += 1
+
+            if scroll_count % 30 == 0:
+                print(f"    {tag}Scrolled {scroll_count}x, found {len(transcript_entries)} entries...")
+    finally:
+        await cdp.detach()
+
+    print(f"    {tag}Total entries: {len(transcript_entries)}")
+    return transcript_entries
+
+
+async def block_unneeded_resources(route):
+    """Abort requests for resources the transcript scrape doesn't need."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class ContextPool:
+    """Pool of pre-warmed browser contexts shared by concurrent workers."""
+
+    def __init__(self, browser, size: int, max_uses: int = CONTEXT_MAX_USES):
+        self._browser = browser
+        self._size = size
+        self._max_uses = max_uses
+        self._q = asyncio.Queue()
+        self._uses = {}
+
+    async def start(self):
+        for _ in range(self._size):
+            await self._q.put(await self._new_context())
+
+    async def _new_context(self):
+        context = await self._browser.new_context(user_agent=USER_AGENT)
+        await context.add_init_script(HIDE_WEBDRIVER_JS)
+        await context.route('**/*', block_unneeded_resources)
+        self._uses[context] = 0
+        return context
+
+    async def acquire(self):
+        context = await self._q.get()
+        if isinstance(context, Exception):
+            # A slot could not be refilled; hand the error on to the next waiter
+            # too, so no worker blocks forever on a slot that will never return
+            self._q.put_nowait(context)
+            raise context
+        return context
+
+    async def release(self, context):
+        self._uses[context] += 1
+        if self._uses[context] >= self._max_uses:
+            # Recycle to bound cache/DOM memory held by long-lived contexts
+            del self._uses[context]
+            try:
+                await context.close()
+            except Exception as e:
+                print(f"  Warning: could not close recycled context: {e}")
+            try:
+                context = await self._new_context()
+            except Exception as e:
+                print(f"  Error: could not create a replacement context: {e}")
+                context = RuntimeError(f"Browser context pool slot lost: {e}")
+        await self._q.put(context)
+
+    async def close(self):
+        while not self._q.empty():
+            context = self._q.get_nowait()
+            if not isinstance(context, Exception):
+                await context.close()
+        self._uses.clear()
+
+
+async def process_event(pool: ContextPool, request, event: dict, output_dir: Path, existing: set,
+                        sem: asyncio.Semaphore, *, page_timeout: int = PAGE_TIMEOUT,
+                        content_timeout: int = CONTENT_TIMEOUT, label: str = '') -> bool:
+    """Process a single event once a concurrency slot is free.
+
+    Every Zoom link is downloaded, in up to MAX_PAGES_PER_EVENT parallel pages of
+    one pooled context; the first goes to {date}-{name}.md and the rest to
+    {date}-{name}-{idx}.md. Expired links are skipped, and the event counts as
+    successful once every live link is saved (and at least one link is saved).
+    page_timeout and content_timeout (ms) apply to the first attempt and double
+    on each retry. label (e.g. "[3/40]") prefixes this event's log lines, which
+    interleave with other events'.
+    """
+    event_name = event.get('event_name', 'Unknown Event')
+    date = event.get('date', '')
+    zoom_links = event.get('zoom_links', [])
+
+    async with sem:
+        print(f"\n{label} {event_name[:50]}")
+        print("-" * 60)
+
+        if not zoom_links:
+            print(f"  {label} No Zoom links")
+            return False
+
+        # Create filenames, skipping links that were already downloaded
+        safe_name = sanitize_filename(event_name)
+        links = []
+        for idx, zoom_url in enumerate(zoom_links):
+            name = f"{safe_name}-{idx}" if idx else safe_name
+            filename = f"{date}-{name}.md" if date else f"{name}.md"
+            if filename in existing:
+                print(f"  {label} Already exists: {filename}")
+            else:
+                links.append((idx, zoom_url, filename, name))
+
+        # Already-downloaded and expired links are both settled: the event fails
+        # only if none of its links is on disk or still downloadable
+        already_saved = len(links) < len(zoom_links)
+        if not links:
+            return True
+
+        # Expired/deleted recordings are detectable without a browser page
+        live = await asyncio.gather(*[is_live(zoom_url, request) for _, zoom_url, _, _ in links])
+        for (idx, _, _, _), ok in zip(links, live):
+            if not ok:
+                print(f"  {label}:{idx} Recording expired/deleted")
+        links = [link for link, ok in zip(links, live) if ok]
+        if not links:
+            return already_saved
+
+        context = await pool.acquire()
+        pages = asyncio.Semaphore(MAX_PAGES_PER_EVENT)
+
+        async def download(idx, zoom_url, filename, name):
+            async with pages:
+                return await _process_link(context, event, zoom_url, output_dir / filename, name,
+                                           page_timeout, content_timeout, tag=f"{label}:{idx} ")
+
+        try:
+            results = await asyncio.gather(*[
+                download(idx, zoom_url, filename, name) for idx, zoom_url, filename, name in links
+            ])
+        finally:
+            await pool.release(context)
+
+        for (_, _, filename, _), success in zip(links, results):
+            if success:
+                existing.add(filename)
+        return all(results)
+
+
+async def _process_link(context, event: dict, zoom_url: str, output_path: Path, debug_name: str,
+                        page_timeout: int, content_timeout: int, tag: str = '') -> bool:
+    """Download one recording, retrying timeouts and video errors with longer waits."""
+    for attempt in range(MAX_RETRIES + 1):
+        scale = 2 ** attempt
+        if attempt:
+            print(f"  {tag}Retrying ({attempt}/{MAX_RETRIES}) with {page_timeout * scale / 1000:.0f}s timeouts...")
+        success = await _process_event(context, event, zoom_url, output_path, debug_name,
+                                       page_timeout * scale, content_timeout * scale, tag)
+        if success is not None:
+            return success
+    return False
+
+
+async def _save_debug_screenshot(page, output_path: Path, debug_name: str):
+    """Save a screenshot of a failed page to debug/ next to the transcripts."""
+    debug_dir = output_path.parent / "debug"
+    await asyncio.to_thread(debug_dir.mkdir, exist_ok=True)
+    await page.screenshot(path=str(debug_dir / f"{debug_name}.png"))
+
+
+async def _process_event(context, event: dict, zoom_url: str, output_path: Path, debug_name: str,
+                         page_timeout: int, content_timeout: int, tag: str = ''):
+    """Download the transcript at zoom_url to output_path.
+
+    tag prefixes every log line for this link.
+
+    Returns None when the page timed out, the video failed to load, or neither
+    the player nor the transcript UI rendered and nothing was scraped, so the
+    caller can retry with longer timeouts.
+    """
+    event_name = event.get('event_name', 'Unknown Event')
+    date = event.get('date', '')
+    passcode = event.get('passcode', '')
+
+    page = await context.new_page()
+
+    try:
+        print(f"  {tag}Navigating to Zoom...")
+        await page.goto(zoom_url, timeout=page_timeout)
+
+        # Check for expired/deleted recording
+        if 'Error' in await page.title():
+            body = await page.evaluate('() => document.body.innerText.substring(0, 200)')
+            if 'does not exist' in body:
+                print(f"  {tag}Recording expired/deleted")
+                return False
+
+        # Handle passcode
+        if passcode:
+            await enter_passcode(page, passcode, timeout=content_timeout, tag=tag)
+
+        # Wait for video/transcript to load
+        print(f"  {tag}Waiting for content to load...")
+        content_timed_out = False
+        try:
+            await page.wait_for_selector(CONTENT_READY_SELECTOR, state='attached', timeout=content_timeout)
+        except PlaywrightTimeout:
+            content_timed_out = True
+            print(f"  {tag}Transcript UI not detected, trying anyway")
+
+        # Check for video error
+        video_error = await page.query_selector('text="The media could not be loaded"')
+        if video_error:
+            print(f"  {tag}ERROR: Video failed to load")
+            return None
+
+        # The player rendered without any transcript UI: this recording has no
+        # transcript, and a longer wait won't change that
+        if content_timed_out and await page.query_selector('video'):
+            print(f"  {tag}No transcript available for this recording")
+            await _save_debug_screenshot(page, output_path, debug_name)
+            return False
+
+        # Scrape transcript
+        print(f"  {tag}Scraping transcript...")
+        transcript_entries = await scrape_transcript(page, tag)
+
+        if not transcript_entries:
+            print(f"  {tag}No transcript found")
+            await _save_debug_screenshot(page, output_path, debug_name)
+            # Not even the player rendered; let the caller retry with a longer wait
+            return None if content_timed_out else False
+
+        # Format and save (off the event loop so other workers keep running)
+        markdown = format_transcript_as_markdown(event_name, date, transcript_entries)
+        await asyncio.to_thread(output_path.write_text, markdown)
+        print(f"  {tag}Saved: {output_path.name} ({len(transcript_entries)} entries)")
+
+        return True
+
+    except PlaywrightTimeout as e:
+        print(f"  {tag}Timeout: {e}")
+        return None
+    except Exception as e:
+        print(f"  {tag}Error: {e}")
+        return False
+    finally:
+        await page.close()
@@ -0,0 +1,94 @@
+// Transcript inspection probes for the test_single scripts. Loaded once per
+// context with add_init_script so each call is a short evaluate instead of
+// resending and recompiling the whole function source.
+
+// test_single.py: classes, speaker/time containers and text samples in one DOM walk
+window.__probe = () => {
+    const results = {
+        transcript_classes: [],
+        potential_containers: [],
+        text_samples: []
+    };
+
+    // One pass over the DOM fills every bucket; stop once all are full
+    const MAX_HITS = 50;
+    const MAX_SAMPLES = 20;
+    let transcriptArea = null;
+    let sampled = 0;
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT);
+    let el;
+    while ((el = walker.nextNode())) {
+        const className = typeof el.className === 'string' ? el.className : '';
+        const lc = className.toLowerCase();
+
+        // Text samples: the first descendants of the first transcript element
+        if (transcriptArea && sampled < MAX_SAMPLES && transcriptArea.contains(el)) {
+            sampled++;
+            const text = el.textContent?.trim();
+            if (text && text.length > 5 && text.length < 200) {
+                results.text_samples.push({
+                    tag: el.tagName,
+                    class: className.substring(0, 50),
+                    text: text
+                });
+            }
+        }
+
+        // Elements with 'transcript' in class name
+        if (lc.includes('transcript')) {
+            if (!transcriptArea) transcriptArea = el;
+            if (results.transcript_classes.length < MAX_HITS) {
+                results.transcript_classes.push({
+                    tag: el.tagName,
+                    class: className.substring(0, 100),
+                    childCount: el.children.length
+                });
+            }
+        }
+
+        // Speaker/timestamp patterns
+        if (results.potential_containers.length < MAX_HITS &&
+            (lc.includes('speaker') || lc.includes('time') || lc.includes('caption'))) {
+            const text = el.textContent?.trim().substring(0, 100);
+            if (text) {
+                results.potential_containers.push({
+                    tag: el.tagName,
+                    class: className.substring(0, 80),
+                    text: text
+                });
+            }
+        }
+
+        if (results.transcript_classes.length >= MAX_HITS &&
+            results.potential_containers.length >= MAX_HITS &&
+            (sampled >= MAX_SAMPLES || (transcriptArea && !transcriptArea.contains(el)))) {
+            break;
+        }
+    }
+
+    return results;
+};
+
+// test_single_v3.py: elements whose text looks like transcript lines
+window.__probeV3 = () => {
+    // Look for elements with substantial text content, limited to
+    // likely transcript containers instead of every node on the page
+    const RX = /\d{1,2}:\d{2}|Section|Hello|Welcome/i;
+    const allText = [];
+    const candidates = document.querySelectorAll(
+        '[class*="transcript"] *, [class*="caption"] *, [class*="sentence"] *, span, p'
+    );
+    for (const el of candidates) {
+        if (allText.length >= 10) break;
+        const text = el.textContent?.trim();
+        // Check if it looks like transcript (has speaker names, timestamps)
+        if (text && text.length > 50 && text.length < 500 && RX.test(text)) {
+            allText.push({
+                tag: el.tagName,
+                class: el.className?.substring(0, 50),
+                text: text.substring(0, 200)
+            });
+        }
+    }
+    return allText;
+};
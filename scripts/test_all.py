@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Run the v1, v2 and v3 test flows side by side in three tabs of one browser context.
+
+Equivalent to running test_single.py, test_single_v2.py and test_single_v3.py
+back to back, but with one launch and one shared inspection hold (--hold).
+All three tabs use test_single_v3.py's launch options and user agent, which
+v1 and v2 run fine under. Output from the three flows is interleaved.
+"""
+
+import argparse
+import asyncio
+import sys
+from playwright.async_api import async_playwright
+
+from _events import find_event
+from _probe_session import close_probe_context, new_probe_context
+from _shared_browser import get_browser
+from test_single import run_v1
+from test_single_v2 import run_v2
+from test_single_v3 import LAUNCH_OPTIONS as V3_LAUNCH_OPTIONS, USER_AGENT as V3_USER_AGENT, run_v3
+
+
+async def test_all(hold=False):
+    """Open the test event in three tabs and run each variant in its own tab."""
+
+    # Find test event with passcode
+    test_event = find_event("Driving")
+
+    print(f"Testing with: {test_event['event_name']}")
+    print(f"URL: {test_event['zoom_links'][0]}")
+    print(f"Passcode: {test_event.get('passcode', 'None')}")
+
+    async with async_playwright() as p:
+        # v3's environment (Chrome with codecs, its launch args and user agent) is a
+        # superset of what v1 and v2 need
+        browser = await get_browser(p, **V3_LAUNCH_OPTIONS)
+        context = await new_probe_context(browser, user_agent=V3_USER_AGENT)
+        pages = [await context.new_page() for _ in range(3)]
+
+        await asyncio.gather(
+            run_v1(pages[0], test_event),
+            run_v2(pages[1], test_event),
+            run_v3(pages[2], test_event),
+        )
+
+        # Keep browser open (--hold, and only with a terminal attached)
+        if hold and sys.stdout.isatty():
+            print("\n" + "=" * 50)
+            print("Browser staying open for manual inspection.")
+            print("Tabs: v1 (structure), v2 (transcript load), v3 (video + transcript)")
+            print("=" * 50)
+            await asyncio.to_thread(input, "Press Enter to close browser...\n")
+
+        await close_probe_context(context)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the three test flows in parallel tabs')
+    parser.add_argument('--hold', action='store_true', help='Keep the browser open until Enter is pressed')
+    args = parser.parse_args()
+    asyncio.run(test_all(hold=args.hold))
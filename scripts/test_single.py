@@ -4,166 +4,104 @@ Test script to explore Zoom transcript page structure.
 Run this first to understand the DOM before full automation.
 """
 
+import argparse
 import asyncio
-import json
+import sys
 from pathlib import Path
 from playwright.async_api import async_playwright
 
-
-async def test_zoom_page():
+from _events import find_event
+from _probe_session import (capture_mhtml, close_probe_context, new_probe_context,
+                            submit_passcode_if_prompted)
+from _shared_browser import get_browser
+
+
+async def run_v1(page, test_event, dump_html=False):
+    """Explore the transcript page structure of test_event in an open page."""
+    # Navigate
+    print("\nNavigating to Zoom...")
+    # Return once the response commits; Zoom's player never goes network-idle
+    await page.goto(test_event['zoom_links'][0], wait_until="commit", timeout=30000)
+
+    # Check for passcode prompt
+    passcode = test_event.get('passcode', '')
+    if passcode:
+        print(f"\nLooking for passcode input...")
+        await submit_passcode_if_prompted(page, passcode)
+
+    # Click Audio Transcript tab
+    print("\nLooking for Audio Transcript tab...")
+    try:
+        # click() waits for the player UI to render the tab
+        tab = page.get_by_role("tab", name="Audio Transcript").or_(
+            page.locator('button:has-text("Audio Transcript")')
+        )
+        print("Clicking Audio Transcript tab...")
+        await tab.first.click(timeout=15000)
+        await page.locator('.transcript-wrapper, [class*="transcript-list"]').first.wait_for(timeout=15000)
+    except Exception as e:
+        print(f"Tab click: {e}")
+
+    # Now let's inspect the page structure
+    print("\n" + "=" * 50)
+    print("PAGE STRUCTURE ANALYSIS")
+    print("=" * 50)
+
+    # Get all elements that might contain transcript
+    analysis = await page.evaluate('() => window.__probe()')
+
+    print("\nElements with 'transcript' in class:")
+    for item in analysis.get('transcript_classes', [])[:10]:
+        print(f"  <{item['tag']}> class='{item['class']}' children={item['childCount']}")
+
+    print("\nPotential speaker/time containers:")
+    for item in analysis.get('potential_containers', [])[:10]:
+        print(f"  <{item['tag']}> class='{item['class']}'")
+        print(f"    text: {item['text'][:80]}")
+
+    print("\nText samples from transcript area:")
+    for item in analysis.get('text_samples', [])[:10]:
+        print(f"  <{item['tag']}> {item['text'][:100]}")
+
+    # Save a full page snapshot for analysis (serializes the whole DOM, so opt-in)
+    if dump_html:
+        mhtml = await capture_mhtml(page)
+        debug_path = Path(__file__).parent.parent / "debug_page.mhtml"
+        await asyncio.to_thread(debug_path.write_bytes, mhtml.encode('utf-8'))
+        print(f"\nSaved full page snapshot to: {debug_path}")
+
+
+async def test_zoom_page(dump_html=False, hold=False):
     """Open a single Zoom recording and explore the page structure."""
 
-    # Load one event with passcode for testing
-    events_file = Path(__file__).parent.parent / "events.json"
-    with open(events_file) as f:
-        events = json.load(f)
-
-    # Find "Driving & Measuring Rapid AI Adoption" which has a passcode
-    test_event = None
-    for e in events:
-        if "Driving" in e.get('event_name', ''):
-            test_event = e
-            break
-
-    if not test_event:
-        test_event = events[0]
+    # Load "Driving & Measuring Rapid AI Adoption", which has a passcode
+    test_event = find_event("Driving")
 
     print(f"Testing with: {test_event['event_name']}")
     print(f"URL: {test_event['zoom_links'][0]}")
     print(f"Passcode: {test_event.get('passcode', 'None')}")
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
+        browser = await get_browser(p, headless=False)
+        context = await new_probe_context(browser)
         page = await context.new_page()
 
-        # Navigate
-        print("\nNavigating to Zoom...")
-        await page.goto(test_event['zoom_links'][0], timeout=30000)
-        await page.wait_for_load_state('networkidle')
-
-        # Check for passcode prompt
-        passcode = test_event.get('passcode', '')
-        if passcode:
-            print(f"\nLooking for passcode input...")
-            try:
-                # Look for password input
-                pwd_input = await page.wait_for_selector(
-                    'input[type="password"]',
-                    timeout=5000
-                )
-                if pwd_input:
-                    print(f"Found password input, entering: {passcode}")
-                    await pwd_input.fill(passcode)
-
-                    # Find and click submit
-                    submit = await page.query_selector('button[type="submit"], #passcode_btn')
-                    if submit:
-                        await submit.click()
-                        await page.wait_for_load_state('networkidle', timeout=15000)
-                        print("Submitted passcode")
-            except Exception as e:
-                print(f"Passcode handling: {e}")
-
-        # Wait for transcript to load
-        await page.wait_for_timeout(3000)
-
-        # Click Audio Transcript tab
-        print("\nLooking for Audio Transcript tab...")
-        try:
-            tab = await page.query_selector('button:has-text("Audio Transcript")')
-            if tab:
-                print("Clicking Audio Transcript tab...")
-                await tab.click()
-                await page.wait_for_timeout(2000)
-        except Exception as e:
-            print(f"Tab click: {e}")
-
-        # Now let's inspect the page structure
-        print("\n" + "=" * 50)
-        print("PAGE STRUCTURE ANALYSIS")
-        print("=" * 50)
-
-        # Get all elements that might contain transcript
-        analysis = await page.evaluate('''() => {
-            const results = {
-                transcript_classes: [],
-                potential_containers: [],
-                text_samples: []
-            };
-
-            // Find elements with 'transcript' in class name
-            document.querySelectorAll('*').forEach(el => {
-                const className = el.className;
-                if (typeof className === 'string' && className.toLowerCase().includes('transcript')) {
-                    results.transcript_classes.push({
-                        tag: el.tagName,
-                        class: className.substring(0, 100),
-                        childCount: el.children.length
-                    });
-                }
-            });
-
-            // Look for speaker/timestamp patterns
-            document.querySelectorAll('[class*="speaker"], [class*="time"], [class*="caption"]').forEach(el => {
-                const text = el.textContent?.trim().substring(0, 100);
-                if (text) {
-                    results.potential_containers.push({
-                        tag: el.tagName,
-                        class: el.className?.substring(0, 80),
-                        text: text
-                    });
-                }
-            });
-
-            // Get some text samples from the transcript area
-            const transcriptArea = document.querySelector('[class*="transcript"]');
-            if (transcriptArea) {
-                const children = transcriptArea.querySelectorAll('*');
-                for (let i = 0; i < Math.min(20, children.length); i++) {
-                    const text = children[i].textContent?.trim();
-                    if (text && text.length > 5 && text.length < 200) {
-                        results.text_samples.push({
-                            tag: children[i].tagName,
-                            class: children[i].className?.substring(0, 50),
-                            text: text
-                        });
-                    }
-                }
-            }
-
-            return results;
-        }''')
-
-        print("\nElements with 'transcript' in class:")
-        for item in analysis.get('transcript_classes', [])[:10]:
-            print(f"  <{item['tag']}> class='{item['class']}' children={item['childCount']}")
-
-        print("\nPotential speaker/time containers:")
-        for item in analysis.get('potential_containers', [])[:10]:
-            print(f"  <{item['tag']}> class='{item['class']}'")
-            print(f"    text: {item['text'][:80]}")
-
-        print("\nText samples from transcript area:")
-        for item in analysis.get('text_samples', [])[:10]:
-            print(f"  <{item['tag']}> {item['text'][:100]}")
-
-        # Save full page HTML for analysis
-        html = await page.content()
-        debug_path = Path(__file__).parent.parent / "debug_page.html"
-        debug_path.write_text(html)
-        print(f"\nSaved full HTML to: {debug_path}")
-
-        # Keep browser open for manual inspection
-        print("\n" + "=" * 50)
-        print("Browser will stay open for 60 seconds for manual inspection.")
-        print("Check the page structure and transcript panel.")
-        print("=" * 50)
-
-        await page.wait_for_timeout(60000)
-
-        await browser.close()
+        await run_v1(page, test_event, dump_html=dump_html)
+
+        # Keep browser open for manual inspection (--hold, and only with a terminal attached)
+        if hold and sys.stdout.isatty():
+            print("\n" + "=" * 50)
+            print("Browser open for manual inspection.")
+            print("Check the page structure and transcript panel.")
+            print("=" * 50)
+            await asyncio.to_thread(input, "Press Enter to close browser...\n")
+
+        await close_probe_context(context)
 
 
 if __name__ == "__main__":
-    asyncio.run(test_zoom_page())
+    parser = argparse.ArgumentParser(description='Explore the Zoom transcript page structure')
+    parser.add_argument('--dump-html', action='store_true', help='Save an MHTML snapshot of the page to debug_page.mhtml')
+    parser.add_argument('--hold', action='store_true', help='Keep the browser open until Enter is pressed')
+    args = parser.parse_args()
+    asyncio.run(test_zoom_page(dump_html=args.dump_html, hold=args.hold))
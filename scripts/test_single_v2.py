@@ -3,122 +3,131 @@
 Test script v2 - waits for transcript content to actually load.
 """
 
+import argparse
 import asyncio
-import json
+import sys
 from pathlib import Path
 from playwright.async_api import async_playwright
 
-
-async def test_zoom_page():
-    """Open Zoom recording and wait for transcript to load."""
-
-    events_file = Path(__file__).parent.parent / "events.json"
-    with open(events_file) as f:
-        events = json.load(f)
-
-    # Find test event with passcode
-    test_event = None
-    for e in events:
-        if "Driving" in e.get('event_name', ''):
-            test_event = e
-            break
-
-    if not test_event:
-        test_event = events[0]
-
-    print(f"Testing with: {test_event['event_name']}")
-    print(f"URL: {test_event['zoom_links'][0]}")
-    print(f"Passcode: {test_event.get('passcode', 'None')}")
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
-        page = await context.new_page()
-
-        # Navigate
-        print("\n1. Navigating to Zoom...")
-        await page.goto(test_event['zoom_links'][0], timeout=30000)
-        await page.wait_for_load_state('networkidle')
-
-        # Handle passcode
-        passcode = test_event.get('passcode', '')
-        if passcode:
-            print(f"\n2. Looking for passcode input...")
-            try:
-                pwd_input = await page.wait_for_selector('input[type="password"]', timeout=5000)
-                if pwd_input:
-                    print(f"   Entering passcode: {passcode}")
-                    await pwd_input.fill(passcode)
-
-                    submit = await page.query_selector('button[type="submit"], #passcode_btn')
-                    if submit:
-                        await submit.click()
-                        await page.wait_for_load_state('networkidle', timeout=15000)
-                        print("   Passcode submitted")
-            except Exception as e:
-                print(f"   Passcode handling: {e}")
-
-        # Wait for video player to load
-        print("\n3. Waiting for video player...")
-        await page.wait_for_timeout(5000)
-
-        # Look for and click Audio Transcript tab
-        print("\n4. Looking for Audio Transcript tab...")
-
-        # Try multiple selectors for the transcript tab
-        tab_selectors = [
-            'button:has-text("Audio Transcript")',
-            '[role="tab"]:has-text("Audio Transcript")',
-            '[data-testid="audio-transcript-tab"]',
-            '.transcript-tab',
-            'text="Audio Transcript"',
-        ]
-
-        tab_clicked = False
-        for selector in tab_selectors:
-            try:
-                tab = await page.wait_for_selector(selector, timeout=3000)
-                if tab:
-                    print(f"   Found tab with selector: {selector}")
-                    await tab.click()
-                    tab_clicked = True
-                    break
-            except:
-                continue
-
-        if not tab_clicked:
-            print("   Could not find Audio Transcript tab - checking if transcript is already visible")
-
-        # Wait for transcript content to load
-        print("\n5. Waiting for transcript content...")
-        await page.wait_for_timeout(3000)
-
-        # Try to find transcript entries
-        transcript_selectors = [
-            '[class*="transcript-sentence"]',
-            '[class*="transcript-item"]',
-            '[class*="TranscriptItem"]',
-            '[class*="caption"]',
-            '[class*="vtt-item"]',
-            '.transcript-wrapper > *',
-        ]
-
-        for selector in transcript_selectors:
-            try:
-                elements = await page.query_selector_all(selector)
-                if elements and len(elements) > 0:
-                    print(f"   Found {len(elements)} elements with: {selector}")
-
-                    # Get text from first few elements
-                    for i, el in enumerate(elements[:5]):
-                        text = await el.text_content()
-                        print(f"     [{i}]: {text[:100] if text else 'empty'}")
-            except Exception as e:
-                pass
-
-        # Get current page HTML around transcript area
-        print("\n6. Analyzing transcript area...")
-        transcript_html = await page.evaluate('''() => {
+from _events import find_event
+from _probe_session import (capture_mhtml, close_probe_context, new_probe_context,
+                            submit_passcode_if_prompted)
+from _shared_browser import get_browser
+
+
+# Resolves with the first selector that matches (and its match count) as soon
+# as the DOM mutates into it, or null after the timeout
+WAIT_FOR_ANY_JS = '''([selectors, timeout]) => new Promise(resolve => {
+    const check = () => {
+        for (const sel of selectors) {
+            const n = document.querySelectorAll(sel).length;
+            if (n) return {sel, n};
+        }
+        return null;
+    };
+    const found = check();
+    if (found) return resolve(found);
+    const observer = new MutationObserver(() => {
+        const hit = check();
+        if (hit) {
+            observer.disconnect();
+            resolve(hit);
+        }
+    });
+    observer.observe(document, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ['class']
+    });
+    setTimeout(() => { observer.disconnect(); resolve(null); }, timeout);
+})'''
+
+
+async def wait_for_any_selector(page, selectors, timeout=10000):
+    """Wait in-page for the first of selectors to match; returns {'sel', 'n'} or None."""
+    return await page.evaluate(WAIT_FOR_ANY_JS, [selectors, timeout])
+
+
+async def run_v2(page, test_event, dump_html=False, screenshot=False):
+    """Load test_event in an open page and wait for its transcript to load."""
+    # Navigate
+    print("\n1. Navigating to Zoom...")
+    # Return once the response commits; Zoom's player never goes network-idle
+    await page.goto(test_event['zoom_links'][0], wait_until="commit", timeout=30000)
+
+    # Handle passcode
+    passcode = test_event.get('passcode', '')
+    if passcode:
+        print(f"\n2. Looking for passcode input...")
+        await submit_passcode_if_prompted(page, passcode, log_prefix='   ')
+
+    # Wait for video player to load
+    print("\n3. Waiting for video player...")
+    try:
+        await page.locator('video, [class*="transcript-wrapper"]').first.wait_for(timeout=15000)
+    except Exception as e:
+        print(f"   Video player not detected: {e}")
+
+    # Look for and click Audio Transcript tab
+    print("\n4. Looking for Audio Transcript tab...")
+
+    # Try multiple selectors for the transcript tab
+    tab_selectors = [
+        'button:has-text("Audio Transcript")',
+        '[role="tab"]:has-text("Audio Transcript")',
+        '[data-testid="audio-transcript-tab"]',
+        '.transcript-tab',
+        'text="Audio Transcript"',
+    ]
+
+    # One locator matching any of them, so all are tried at once instead of
+    # waiting out each selector in turn
+    tab = page.get_by_role("tab", name="Audio Transcript")
+    for selector in tab_selectors:
+        tab = tab.or_(page.locator(selector))
+
+    tab_clicked = False
+    try:
+        await tab.first.click(timeout=15000)
+        print("   Clicked Audio Transcript tab")
+        tab_clicked = True
+    except Exception:
+        pass
+
+    if not tab_clicked:
+        print("   Could not find Audio Transcript tab - checking if transcript is already visible")
+
+    # Try to find transcript entries
+    transcript_selectors = [
+        '[class*="transcript-sentence"]',
+        '[class*="transcript-item"]',
+        '[class*="TranscriptItem"]',
+        '[class*="caption"]',
+        '[class*="vtt-item"]',
+        '.transcript-wrapper > *',
+    ]
+
+    # Wait for transcript content to load
+    print("\n5. Waiting for transcript content...")
+    match = await wait_for_any_selector(page, transcript_selectors, timeout=15000)
+    if match:
+        selector = match['sel']
+        print(f"   Found {match['n']} elements with: {selector}")
+
+        # Get text from first few elements in one round-trip
+        texts = await page.evaluate(
+            '''(sel) => Array.from(document.querySelectorAll(sel)).slice(0, 5)
+                .map(el => (el.textContent || '').trim().substring(0, 100))''',
+            selector,
+        )
+        for i, text in enumerate(texts):
+            print(f"     [{i}]: {text or 'empty'}")
+    else:
+        print("   Transcript content not detected")
+
+    # Get current page HTML around transcript area, plus whichever of screenshot and
+    # full page snapshot were requested; the reads are independent, so run them together
+    print("\n6. Analyzing transcript area...")
+    reads = {
+        'transcript_html': page.evaluate('''() => {
             const wrapper = document.querySelector('.transcript-wrapper');
             if (wrapper) {
                 return {
@@ -128,36 +137,67 @@ async def test_zoom_page():
                 };
             }
             return null;
-        }''')
-
-        if transcript_html:
-            print(f"   transcript-wrapper children: {transcript_html['childCount']}")
-            print(f"   HTML preview: {transcript_html['html'][:500]}...")
-        else:
-            print("   transcript-wrapper not found or empty")
-
-        # Take a screenshot for inspection
+        }'''),
+    }
+    if screenshot:
+        reads['png'] = page.screenshot(full_page=False)
+    if dump_html:
+        reads['mhtml'] = capture_mhtml(page)
+    results = dict(zip(reads, await asyncio.gather(*reads.values())))
+    transcript_html = results['transcript_html']
+
+    if transcript_html:
+        print(f"   transcript-wrapper children: {transcript_html['childCount']}")
+        print(f"   HTML preview: {transcript_html['html'][:500]}...")
+    else:
+        print("   transcript-wrapper not found or empty")
+
+    if 'png' in results:
         screenshot_path = Path(__file__).parent.parent / "debug_screenshot.png"
-        await page.screenshot(path=str(screenshot_path), full_page=False)
+        await asyncio.to_thread(screenshot_path.write_bytes, results['png'])
         print(f"\n7. Screenshot saved to: {screenshot_path}")
 
-        # Save HTML
-        html = await page.content()
-        debug_path = Path(__file__).parent.parent / "debug_page_v2.html"
-        debug_path.write_text(html)
-        print(f"   HTML saved to: {debug_path}")
+    # Save page snapshot
+    if 'mhtml' in results:
+        debug_path = Path(__file__).parent.parent / "debug_page_v2.mhtml"
+        await asyncio.to_thread(debug_path.write_bytes, results['mhtml'].encode('utf-8'))
+        print(f"   Page snapshot saved to: {debug_path}")
+
+
+async def test_zoom_page(dump_html=False, screenshot=False, hold=False):
+    """Open Zoom recording and wait for transcript to load."""
+
+    # Find test event with passcode
+    test_event = find_event("Driving")
+
+    print(f"Testing with: {test_event['event_name']}")
+    print(f"URL: {test_event['zoom_links'][0]}")
+    print(f"Passcode: {test_event.get('passcode', 'None')}")
+
+    async with async_playwright() as p:
+        browser = await get_browser(p, headless=False)
+        context = await new_probe_context(browser)
+        page = await context.new_page()
+
+        await run_v2(page, test_event, dump_html=dump_html, screenshot=screenshot)
 
-        # Keep browser open
-        print("\n" + "=" * 50)
-        print("Browser open for 90 seconds - manually inspect:")
-        print("1. Is the video playing?")
-        print("2. Is there an 'Audio Transcript' tab on the right?")
-        print("3. Does clicking it show transcript text?")
-        print("=" * 50)
+        # Keep browser open (--hold, and only with a terminal attached)
+        if hold and sys.stdout.isatty():
+            print("\n" + "=" * 50)
+            print("Browser open - manually inspect:")
+            print("1. Is the video playing?")
+            print("2. Is there an 'Audio Transcript' tab on the right?")
+            print("3. Does clicking it show transcript text?")
+            print("=" * 50)
+            await asyncio.to_thread(input, "Press Enter to close browser...\n")
 
-        await page.wait_for_timeout(90000)
-        await browser.close()
+        await close_probe_context(context)
 
 
 if __name__ == "__main__":
-    asyncio.run(test_zoom_page())
+    parser = argparse.ArgumentParser(description='Wait for the Zoom transcript to load and inspect it')
+    parser.add_argument('--dump-html', action='store_true', help='Save an MHTML snapshot of the page to debug_page_v2.mhtml')
+    parser.add_argument('--screenshot', action='store_true', help='Save a screenshot to debug_screenshot.png')
+    parser.add_argument('--hold', action='store_true', help='Keep the browser open until Enter is pressed')
+    args = parser.parse_args()
+    asyncio.run(test_zoom_page(dump_html=args.dump_html, screenshot=args.screenshot, hold=args.hold))
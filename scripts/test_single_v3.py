@@ -3,153 +3,138 @@
 Test script v3 - Use Chrome with user data to avoid codec issues.
 """
 
+import argparse
 import asyncio
-import json
+import re
+import sys
 from pathlib import Path
 from playwright.async_api import async_playwright
 
+from _events import find_event
+from _probe_session import close_probe_context, new_probe_context, submit_passcode_if_prompted
+from _shared_browser import get_browser
+
+# Launch with Chrome channel which has proper codecs
+LAUNCH_OPTIONS = {
+    'headless': False,
+    'channel': 'chrome',  # Use real Chrome instead of Chromium
+    'args': [
+        '--disable-blink-features=AutomationControlled',
+        '--disable-web-security',
+        '--allow-running-insecure-content',
+    ],
+}
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+async def run_v3(page, test_event, screenshot=False):
+    """Load test_event in an open page and check the video and transcript."""
+    # Remove webdriver property
+    await page.add_init_script("""
+        Object.defineProperty(navigator, 'webdriver', {
+            get: () => undefined
+        });
+    """)
+
+    # Navigate
+    print("\n1. Navigating to Zoom...")
+    # Return once the response commits; Zoom's player never goes network-idle
+    await page.goto(test_event['zoom_links'][0], wait_until="commit", timeout=30000)
+
+    # Handle passcode
+    passcode = test_event.get('passcode', '')
+    if passcode:
+        print(f"\n2. Looking for passcode input...")
+        await submit_passcode_if_prompted(page, passcode, log_prefix='   ')
+
+    # Wait for video to load
+    print("\n3. Waiting for video player to load...")
+    try:
+        await page.locator('video, [class*="transcript-wrapper"]').first.wait_for(timeout=15000)
+    except Exception as e:
+        print(f"   Video player not detected: {e}")
+
+    # Check for video error, taking the screenshot (if requested) at the same time
+    reads = {'video_error': page.get_by_text("The media could not be loaded", exact=True).count()}
+    if screenshot:
+        reads['png'] = page.screenshot(full_page=False)
+    results = dict(zip(reads, await asyncio.gather(*reads.values())))
+    if results['video_error']:
+        print("   ERROR: Video still cannot load")
+    else:
+        print("   Video appears to be loading")
+
+    if 'png' in results:
+        screenshot_path = Path(__file__).parent.parent / "debug_screenshot_v3.png"
+        await asyncio.to_thread(screenshot_path.write_bytes, results['png'])
+        print(f"\n4. Screenshot saved to: {screenshot_path}")
 
-async def test_zoom_page():
-    """Open Zoom recording using real Chrome browser profile."""
+    # Look for transcript tab
+    print("\n5. Looking for Audio Transcript tab...")
 
-    events_file = Path(__file__).parent.parent / "events.json"
-    with open(events_file) as f:
-        events = json.load(f)
+    # Filter button/tab labels in the page instead of fetching each one over CDP;
+    # the same locator finds and clicks, so the match can't drift to another element
+    buttons = page.locator('button, [role="tab"]')
+    transcript_tabs = buttons.filter(has_text=re.compile('transcript', re.I))
+    print(f"   Found {await buttons.count()} buttons/tabs")
 
-    # Find test event with passcode
-    test_event = None
-    for e in events:
-        if "Driving" in e.get('event_name', ''):
-            test_event = e
-            break
+    if await transcript_tabs.count():
+        tab = transcript_tabs.first
+        try:
+            print(f"   Found transcript button: {await tab.text_content()}")
+            await tab.click(timeout=10000)
+            await page.locator('.transcript-wrapper, [class*="transcript-list"]').first.wait_for(timeout=15000)
+        except Exception as e:
+            print(f"   Transcript panel not detected: {e}")
+
+    # Look for transcript content
+    print("\n6. Looking for transcript content...")
+
+    # Search for any text that looks like transcript
+    transcript_text = await page.evaluate('() => window.__probeV3()')
+
+    if transcript_text:
+        print(f"   Found {len(transcript_text)} potential transcript elements:")
+        for item in transcript_text:
+            print(f"     <{item['tag']}> {item['text'][:100]}...")
+    else:
+        print("   No transcript text found")
 
-    if not test_event:
-        test_event = events[0]
+
+async def test_zoom_page(screenshot=False, hold=False):
+    """Open Zoom recording using real Chrome browser profile."""
+
+    # Find test event with passcode
+    test_event = find_event("Driving")
 
     print(f"Testing with: {test_event['event_name']}")
     print(f"URL: {test_event['zoom_links'][0]}")
     print(f"Passcode: {test_event.get('passcode', 'None')}")
 
     async with async_playwright() as p:
-        # Launch with Chrome channel which has proper codecs
-        browser = await p.chromium.launch(
-            headless=False,
-            channel="chrome",  # Use real Chrome instead of Chromium
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-security',
-                '--allow-running-insecure-content',
-            ]
-        )
-
-        context = await browser.new_context(
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
+        browser = await get_browser(p, **LAUNCH_OPTIONS)
+        context = await new_probe_context(browser, user_agent=USER_AGENT)
         page = await context.new_page()
 
-        # Remove webdriver property
-        await page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-        """)
-
-        # Navigate
-        print("\n1. Navigating to Zoom...")
-        await page.goto(test_event['zoom_links'][0], timeout=30000)
-        await page.wait_for_load_state('networkidle')
-
-        # Handle passcode
-        passcode = test_event.get('passcode', '')
-        if passcode:
-            print(f"\n2. Looking for passcode input...")
-            try:
-                pwd_input = await page.wait_for_selector('input[type="password"]', timeout=5000)
-                if pwd_input:
-                    print(f"   Entering passcode: {passcode}")
-                    await pwd_input.fill(passcode)
-
-                    submit = await page.query_selector('button[type="submit"], #passcode_btn')
-                    if submit:
-                        await submit.click()
-                        await page.wait_for_load_state('networkidle', timeout=15000)
-                        print("   Passcode submitted")
-            except Exception as e:
-                print(f"   No passcode needed or error: {e}")
-
-        # Wait longer for video to load
-        print("\n3. Waiting for video player to load (10s)...")
-        await page.wait_for_timeout(10000)
-
-        # Check for video error
-        video_error = await page.query_selector('text="The media could not be loaded"')
-        if video_error:
-            print("   ERROR: Video still cannot load")
-        else:
-            print("   Video appears to be loading")
-
-        # Take screenshot
-        screenshot_path = Path(__file__).parent.parent / "debug_screenshot_v3.png"
-        await page.screenshot(path=str(screenshot_path), full_page=False)
-        print(f"\n4. Screenshot saved to: {screenshot_path}")
+        await run_v3(page, test_event, screenshot=screenshot)
+
+        # Keep browser open (--hold, and only with a terminal attached)
+        if hold and sys.stdout.isatty():
+            print("\n" + "=" * 50)
+            print("Browser staying open for manual inspection.")
+            print("Please check if:")
+            print("1. The video loads and plays")
+            print("2. The Audio Transcript tab is visible")
+            print("3. Clicking it shows transcript text")
+            print("=" * 50)
+            await asyncio.to_thread(input, "Press Enter to close browser...\n")
 
-        # Look for transcript tab
-        print("\n5. Looking for Audio Transcript tab...")
-
-        # Get all buttons and tabs
-        buttons = await page.query_selector_all('button, [role="tab"]')
-        print(f"   Found {len(buttons)} buttons/tabs")
-
-        for btn in buttons[:20]:
-            text = await btn.text_content()
-            if text and 'transcript' in text.lower():
-                print(f"   Found transcript button: {text}")
-                await btn.click()
-                await page.wait_for_timeout(2000)
-                break
-
-        # Look for transcript content
-        print("\n6. Looking for transcript content...")
-
-        # Search for any text that looks like transcript
-        transcript_text = await page.evaluate('''() => {
-            // Look for elements with substantial text content
-            const allText = [];
-            document.querySelectorAll('*').forEach(el => {
-                const text = el.textContent?.trim();
-                if (text && text.length > 50 && text.length < 500) {
-                    // Check if it looks like transcript (has speaker names, timestamps)
-                    if (text.match(/\\d{1,2}:\\d{2}/) || text.match(/Section|Hello|Welcome/i)) {
-                        allText.push({
-                            tag: el.tagName,
-                            class: el.className?.substring(0, 50),
-                            text: text.substring(0, 200)
-                        });
-                    }
-                }
-            });
-            return allText.slice(0, 10);
-        }''')
-
-        if transcript_text:
-            print(f"   Found {len(transcript_text)} potential transcript elements:")
-            for item in transcript_text:
-                print(f"     <{item['tag']}> {item['text'][:100]}...")
-        else:
-            print("   No transcript text found")
-
-        # Keep browser open
-        print("\n" + "=" * 50)
-        print("Browser staying open for 2 minutes for manual inspection.")
-        print("Please check if:")
-        print("1. The video loads and plays")
-        print("2. The Audio Transcript tab is visible")
-        print("3. Clicking it shows transcript text")
-        print("=" * 50)
-
-        await page.wait_for_timeout(120000)
-        await browser.close()
+        await close_probe_context(context)
 
 
 if __name__ == "__main__":
-    asyncio.run(test_zoom_page())
+    parser = argparse.ArgumentParser(description='Open a Zoom recording in real Chrome and inspect it')
+    parser.add_argument('--screenshot', action='store_true', help='Save a screenshot to debug_screenshot_v3.png')
+    parser.add_argument('--hold', action='store_true', help='Keep the browser open until Enter is pressed')
+    args = parser.parse_args()
+    asyncio.run(test_zoom_page(screenshot=args.screenshot, hold=args.hold))